@@ -12,12 +12,14 @@ from app.services import (
     CustomerService,
     DiagnosticService
 )
+from app.services.scheduling_service import parse_time_preference
 from app.schemas import (
     TechnicianResponse,
     SpecialtyResponse,
     AvailableSlotResponse,
     AppointmentCreate,
     AppointmentResponse,
+    AppointmentDetailsResponse,
     CustomerCreate,
     CustomerResponse,
 )
@@ -57,7 +59,7 @@ async def get_technician(
     return technician
 
 
-@router.get("/technicians/search/by-criteria")
+@router.get("/technicians/search/by-criteria", response_model=List[TechnicianResponse])
 async def search_technicians(
     zip_code: str,
     appliance_type: str,
@@ -66,12 +68,11 @@ async def search_technicians(
 ):
     """Find technicians matching zip code and appliance type."""
     service = TechnicianService(db)
-    technicians = service.find_technicians_by_criteria(
+    return service.find_technicians_by_criteria(
         zip_code=zip_code,
         appliance_type=appliance_type,
         target_date=target_date
     )
-    return [TechnicianResponse.model_validate(t) for t in technicians]
 
 
 @router.get("/specialties", response_model=List[SpecialtyResponse])
@@ -109,7 +110,7 @@ async def get_available_slots(
         appliance_type=appliance_type,
         start_date=start_date,
         end_date=end_date,
-        time_preference=time_preference
+        time_preference=parse_time_preference(time_preference)
     )
 
 
@@ -163,7 +164,10 @@ async def get_appointment(
     return response_data
 
 
-@router.get("/appointments/confirmation/{confirmation_number}")
+@router.get(
+    "/appointments/confirmation/{confirmation_number}",
+    response_model=AppointmentDetailsResponse
+)
 async def get_appointment_by_confirmation(
     confirmation_number: str,
     db: Session = Depends(get_db)
@@ -78,7 +78,7 @@ async def handle_call_status(
     
     if call_status in ["completed", "busy", "failed", "no-answer", "canceled"]:
         # Clean up the session
-        await session_manager.end_session(call_sid)
+        session_manager.end_session(call_sid)
     
     return PlainTextResponse("OK")
 
@@ -95,7 +95,7 @@ async def media_stream_endpoint(call_sid: str, request: Request):
 @router.get("/session/{call_sid}")
 async def get_session_info(call_sid: str):
     """Get information about an active call session."""
-    session = await session_manager.get_session(call_sid)
+    session = session_manager.get_session(call_sid)
     if not session:
         return {"error": "Session not found"}
     
@@ -117,7 +117,7 @@ async def add_session_context(
     """Add context to an active session (for testing/debugging)."""
     body = await request.json()
     
-    session = await session_manager.get_session(call_sid)
+    session = session_manager.get_session(call_sid)
     if not session:
         return {"error": "Session not found"}
     
@@ -125,10 +125,10 @@ async def add_session_context(
     if "appliance_type" in body:
         session.diagnostic.appliance_type = body["appliance_type"]
     if "symptoms" in body:
-        session.diagnostic.additional_symptoms.extend(body["symptoms"])
+        session.diagnostic.add_symptoms(body["symptoms"])
     if "zip_code" in body:
         session.scheduling.customer_zip_code = body["zip_code"]
     
-    await session_manager.update_session(session)
+    session_manager.update_session(session)
     
     return {"message": "Context updated", "session": session.model_dump()}
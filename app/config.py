@@ -35,6 +35,8 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o"
     openai_realtime_model: str = "gpt-4o-realtime-preview"
     openai_voice: str = "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
+    openai_pool_size: int = 2  # Realtime connections kept open ahead of calls
+    openai_pool_max_idle_seconds: float = 300.0
     
     # SendGrid (for email)
     sendgrid_api_key: str = ""
@@ -18,6 +18,8 @@ from app.database import init_db, get_db_context
 from app.seed_data import seed_database
 from app.api import api_router, voice_router, upload_router
 from app.voice import VoiceAgent, RealtimeHandler
+from app.voice.realtime_handler import openai_pool
+from app.services.image_service import aclose_openai_client
 # Import the shared session_manager from voice.py
 from app.api.voice import session_manager
 
@@ -49,12 +51,17 @@ async def lifespan(app: FastAPI):
     # Create uploads directory
     Path("uploads/images").mkdir(parents=True, exist_ok=True)
     
+    # Have OpenAI connections ready before the first call arrives
+    openai_pool.start()
+    
     logger.info(f"Application ready at {settings.base_url}")
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    await openai_pool.close()
+    await aclose_openai_client()
 
 
 # Create FastAPI application
@@ -132,7 +139,7 @@ async def websocket_media_stream(websocket: WebSocket, call_sid: str):
         logger.error(f"WebSocket error for call {call_sid}: {str(e)}")
     finally:
         # Ensure session is cleaned up
-        await session_manager.end_session(call_sid)
+        session_manager.end_session(call_sid)
 
 
 @app.get("/voice/test")
@@ -152,5 +159,7 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        # Twilio media frames are base64 audio, which doesn't compress
+        ws_per_message_deflate=False
     )
@@ -13,6 +13,7 @@ from app.schemas.appointment import (
     AppointmentCreate,
     AppointmentResponse,
     AppointmentUpdate,
+    AppointmentDetailsResponse,
     TimeSlotResponse,
     AvailableSlotResponse,
 )
@@ -40,6 +41,7 @@ __all__ = [
     "AppointmentCreate",
     "AppointmentResponse",
     "AppointmentUpdate",
+    "AppointmentDetailsResponse",
     "TimeSlotResponse",
     "AvailableSlotResponse",
     "CustomerBase",
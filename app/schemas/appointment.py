@@ -33,6 +33,16 @@ class AvailableSlotResponse(BaseModel):
         from_attributes = True
 
 
+class AppointmentDetailsResponse(BaseModel):
+    """Schema for formatted appointment details."""
+    confirmation_number: str
+    date: str
+    time_window: str
+    technician_name: str
+    appliance_type: str
+    issue_description: str
+
+
 class AppointmentBase(BaseModel):
     """Base schema for appointment data."""
     appliance_type: str
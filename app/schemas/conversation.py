@@ -3,7 +3,11 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Most key facts kept per conversation; older ones are dropped first
+MAX_KEY_FACTS = 50
 
 
 class ConversationPhase(str, Enum):
@@ -21,6 +25,10 @@ class ConversationPhase(str, Enum):
 
 class DiagnosticInfo(BaseModel):
     """Information gathered during diagnosis."""
+    
+    # Mutated on every turn; assignments are plain attribute stores
+    model_config = ConfigDict(validate_assignment=False)
+    
     appliance_type: Optional[str] = None
     appliance_brand: Optional[str] = None
     appliance_model: Optional[str] = None
@@ -40,10 +48,17 @@ class DiagnosticInfo(BaseModel):
     # Resolution
     issue_resolved: bool = False
     resolution_notes: Optional[str] = None
+    
+    def add_symptoms(self, symptoms: List[str]) -> None:
+        """Record additional symptoms."""
+        self.additional_symptoms.extend(symptoms)
 
 
 class SchedulingInfo(BaseModel):
     """Information for scheduling a technician visit."""
+    
+    model_config = ConfigDict(validate_assignment=False)
+    
     customer_zip_code: Optional[str] = None
     preferred_dates: List[str] = Field(default_factory=list)
     preferred_time_of_day: Optional[str] = None  # morning, afternoon, any
@@ -62,6 +77,10 @@ class SchedulingInfo(BaseModel):
 class ConversationState(BaseModel):
     """Complete state of a voice conversation."""
     
+    # Phase, timestamps and counters are written on the call's hot path,
+    # so assignments are not re-validated
+    model_config = ConfigDict(from_attributes=True, validate_assignment=False)
+    
     # Identifiers
     call_sid: str
     customer_phone: str
@@ -93,6 +112,7 @@ class ConversationState(BaseModel):
     # Outcome
     appointment_id: Optional[int] = None
     appointment_confirmation: Optional[str] = None
+    appointment_details: Optional[Dict[str, str]] = None  # formatted at booking
     
     def update_interaction(self) -> None:
         """Update the last interaction timestamp."""
@@ -100,9 +120,8 @@ class ConversationState(BaseModel):
         self.turn_count += 1
     
     def add_fact(self, fact: str) -> None:
-        """Add a key fact to the conversation."""
+        """Add a key fact to the conversation, keeping the most recent ones."""
         if fact not in self.key_facts:
             self.key_facts.append(fact)
-    
-    class Config:
-        from_attributes = True
+            if len(self.key_facts) > MAX_KEY_FACTS:
+                del self.key_facts[:-MAX_KEY_FACTS]
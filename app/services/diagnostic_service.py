@@ -1,11 +1,14 @@
 """Service for appliance diagnostic logic and troubleshooting."""
 
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
 from app.models.technician import ApplianceType
 
 
-# Diagnostic knowledge base - symptoms, questions, and troubleshooting steps
-DIAGNOSTIC_KNOWLEDGE = {
+# Diagnostic knowledge base - symptoms, questions, and troubleshooting steps.
+# Read-only at the top level: every service instance shares this one mapping
+DIAGNOSTIC_KNOWLEDGE = MappingProxyType({
     ApplianceType.WASHER: {
         "common_symptoms": [
             "won't start",
@@ -271,7 +274,7 @@ DIAGNOSTIC_KNOWLEDGE = {
             ]
         }
     }
-}
+})
 
 # Default troubleshooting for appliances without specific entries
 DEFAULT_TROUBLESHOOTING = [
@@ -283,79 +286,149 @@ DEFAULT_TROUBLESHOOTING = [
 ]
 
 
+# Names callers use for each appliance type, built once at import
+_APPLIANCE_ALIASES: Dict[str, str] = {
+    # Washer variations
+    "washer": ApplianceType.WASHER,
+    "washing machine": ApplianceType.WASHER,
+    "clothes washer": ApplianceType.WASHER,
+    "laundry machine": ApplianceType.WASHER,
+    
+    # Dryer variations
+    "dryer": ApplianceType.DRYER,
+    "clothes dryer": ApplianceType.DRYER,
+    "tumble dryer": ApplianceType.DRYER,
+    
+    # Refrigerator variations
+    "refrigerator": ApplianceType.REFRIGERATOR,
+    "fridge": ApplianceType.REFRIGERATOR,
+    "refridgerator": ApplianceType.REFRIGERATOR,  # common misspelling
+    
+    # Dishwasher variations
+    "dishwasher": ApplianceType.DISHWASHER,
+    "dish washer": ApplianceType.DISHWASHER,
+    
+    # Oven variations
+    "oven": ApplianceType.OVEN,
+    "stove": ApplianceType.OVEN,
+    "range": ApplianceType.OVEN,
+    "cooktop": ApplianceType.OVEN,
+    
+    # Microwave variations
+    "microwave": ApplianceType.MICROWAVE,
+    "micro wave": ApplianceType.MICROWAVE,
+    
+    # HVAC variations
+    "hvac": ApplianceType.HVAC,
+    "ac": ApplianceType.HVAC,
+    "air conditioner": ApplianceType.HVAC,
+    "air conditioning": ApplianceType.HVAC,
+    "heat pump": ApplianceType.HVAC,
+    "furnace": ApplianceType.HVAC,
+    "heating": ApplianceType.HVAC,
+    "central air": ApplianceType.HVAC,
+    
+    # Others
+    "garbage disposal": ApplianceType.GARBAGE_DISPOSAL,
+    "disposal": ApplianceType.GARBAGE_DISPOSAL,
+    "water heater": ApplianceType.WATER_HEATER,
+    "hot water heater": ApplianceType.WATER_HEATER,
+    "freezer": ApplianceType.FREEZER,
+}
+
+
+@lru_cache(maxsize=256)
+def _find_troubleshooting(appliance_type: str, symptom_lower: str) -> List[str]:
+    """Look up the troubleshooting steps for a lowercased symptom."""
+    appliance_data = DIAGNOSTIC_KNOWLEDGE.get(appliance_type, {})
+    troubleshooting = appliance_data.get("troubleshooting", {})
+    
+    # Try to find matching symptom
+    for key, steps in troubleshooting.items():
+        if key in symptom_lower or symptom_lower in key:
+            return steps
+    
+    # Return default if no specific match
+    return DEFAULT_TROUBLESHOOTING
+
+
+def _build_symptom_index(
+    symptoms: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], List[int], Dict[str, List[int]]]:
+    """Index symptoms by word: (symptoms, distinct word counts, word -> positions)."""
+    word_counts = []
+    postings: Dict[str, List[int]] = {}
+    for position, symptom in enumerate(symptoms):
+        words = set(symptom.lower().split())
+        word_counts.append(len(words))
+        for word in words:
+            postings.setdefault(word, []).append(position)
+    return symptoms, word_counts, postings
+
+
+# Read-only views handed out by the service getters, built once at import
+_SUPPORTED_APPLIANCES: Tuple[str, ...] = tuple(ApplianceType.ALL_TYPES)
+_COMMON_SYMPTOMS: Dict[str, Tuple[str, ...]] = {
+    appliance_type: tuple(data.get("common_symptoms", ()))
+    for appliance_type, data in DIAGNOSTIC_KNOWLEDGE.items()
+}
+
+# Inverted word index over each appliance's common symptoms
+_SYMPTOM_INDEX = {
+    appliance_type: _build_symptom_index(symptoms)
+    for appliance_type, symptoms in _COMMON_SYMPTOMS.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _match_symptom(
+    appliance_type: str,
+    description_lower: str
+) -> Tuple[Optional[str], float]:
+    """Match a lowercased description to a known symptom by word overlap."""
+    index = _SYMPTOM_INDEX.get(appliance_type)
+    if index is None or not index[0]:
+        return None, 0.0
+    symptoms, word_counts, postings = index
+    
+    # Count shared words per symptom using only the description's words
+    overlaps: Dict[int, int] = {}
+    for word in set(description_lower.split()):
+        for position in postings.get(word, ()):
+            overlaps[position] = overlaps.get(position, 0) + 1
+    
+    # Highest share of the symptom's words wins; ties go to the earlier symptom
+    best_match = None
+    best_score = 0.0
+    for position in sorted(overlaps):
+        score = overlaps[position] / word_counts[position]
+        if score > best_score:
+            best_score = score
+            best_match = symptoms[position]
+    
+    return best_match, best_score
+
+
 class DiagnosticService:
     """Service for appliance diagnostics and troubleshooting."""
     
     def __init__(self):
         self.knowledge = DIAGNOSTIC_KNOWLEDGE
     
-    def get_supported_appliances(self) -> List[str]:
-        """Get list of supported appliance types."""
-        return ApplianceType.ALL_TYPES
+    def get_supported_appliances(self) -> Tuple[str, ...]:
+        """Get supported appliance types."""
+        return _SUPPORTED_APPLIANCES
     
     def normalize_appliance_type(self, user_input: str) -> Optional[str]:
         """
         Normalize user input to a standard appliance type.
         Handles common variations and typos.
         """
-        user_input = user_input.lower().strip()
-        
-        # Direct mappings
-        mappings = {
-            # Washer variations
-            "washer": ApplianceType.WASHER,
-            "washing machine": ApplianceType.WASHER,
-            "clothes washer": ApplianceType.WASHER,
-            "laundry machine": ApplianceType.WASHER,
-            
-            # Dryer variations
-            "dryer": ApplianceType.DRYER,
-            "clothes dryer": ApplianceType.DRYER,
-            "tumble dryer": ApplianceType.DRYER,
-            
-            # Refrigerator variations
-            "refrigerator": ApplianceType.REFRIGERATOR,
-            "fridge": ApplianceType.REFRIGERATOR,
-            "refridgerator": ApplianceType.REFRIGERATOR,  # common misspelling
-            
-            # Dishwasher variations
-            "dishwasher": ApplianceType.DISHWASHER,
-            "dish washer": ApplianceType.DISHWASHER,
-            
-            # Oven variations
-            "oven": ApplianceType.OVEN,
-            "stove": ApplianceType.OVEN,
-            "range": ApplianceType.OVEN,
-            "cooktop": ApplianceType.OVEN,
-            
-            # Microwave variations
-            "microwave": ApplianceType.MICROWAVE,
-            "micro wave": ApplianceType.MICROWAVE,
-            
-            # HVAC variations
-            "hvac": ApplianceType.HVAC,
-            "ac": ApplianceType.HVAC,
-            "air conditioner": ApplianceType.HVAC,
-            "air conditioning": ApplianceType.HVAC,
-            "heat pump": ApplianceType.HVAC,
-            "furnace": ApplianceType.HVAC,
-            "heating": ApplianceType.HVAC,
-            "central air": ApplianceType.HVAC,
-            
-            # Others
-            "garbage disposal": ApplianceType.GARBAGE_DISPOSAL,
-            "disposal": ApplianceType.GARBAGE_DISPOSAL,
-            "water heater": ApplianceType.WATER_HEATER,
-            "hot water heater": ApplianceType.WATER_HEATER,
-            "freezer": ApplianceType.FREEZER,
-        }
-        
-        return mappings.get(user_input)
+        return _APPLIANCE_ALIASES.get(user_input.strip().casefold())
     
-    def get_common_symptoms(self, appliance_type: str) -> List[str]:
+    def get_common_symptoms(self, appliance_type: str) -> Tuple[str, ...]:
         """Get common symptoms for an appliance type."""
-        appliance_data = self.knowledge.get(appliance_type, {})
-        return appliance_data.get("common_symptoms", [])
+        return _COMMON_SYMPTOMS.get(appliance_type, ())
     
     def get_diagnostic_questions(self, appliance_type: str) -> List[str]:
         """Get diagnostic questions to ask for an appliance type."""
@@ -368,17 +441,7 @@ class DiagnosticService:
         symptom: str
     ) -> List[str]:
         """Get troubleshooting steps for a specific symptom."""
-        appliance_data = self.knowledge.get(appliance_type, {})
-        troubleshooting = appliance_data.get("troubleshooting", {})
-        
-        # Try to find matching symptom
-        symptom_lower = symptom.lower()
-        for key, steps in troubleshooting.items():
-            if key in symptom_lower or symptom_lower in key:
-                return steps
-        
-        # Return default if no specific match
-        return DEFAULT_TROUBLESHOOTING
+        return _find_troubleshooting(appliance_type, symptom.lower())
     
     def match_symptom(
         self, 
@@ -391,29 +454,7 @@ class DiagnosticService:
         Returns:
             Tuple of (matched_symptom, confidence_score)
         """
-        symptoms = self.get_common_symptoms(appliance_type)
-        if not symptoms:
-            return None, 0.0
-        
-        user_description = user_description.lower()
-        
-        # Simple keyword matching
-        best_match = None
-        best_score = 0.0
-        
-        for symptom in symptoms:
-            symptom_words = set(symptom.lower().split())
-            description_words = set(user_description.split())
-            
-            # Calculate overlap
-            overlap = len(symptom_words & description_words)
-            if overlap > 0:
-                score = overlap / len(symptom_words)
-                if score > best_score:
-                    best_score = score
-                    best_match = symptom
-        
-        return best_match, best_score
+        return _match_symptom(appliance_type, user_description.lower())
     
     def should_schedule_technician(
         self,
@@ -3,10 +3,13 @@
 import secrets
 import logging
 import base64
+import mmap
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Tuple
 
+import httpx
+import openai
 from sqlalchemy.orm import Session
 
 from app.config import settings
@@ -18,6 +21,43 @@ logger = logging.getLogger(__name__)
 UPLOAD_DIR = Path("uploads/images")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Data URI prefixes for the vision API, keyed by file extension
+_DATA_URI_PREFIX = {
+    ".jpg": b"data:image/jpeg;base64,",
+    ".jpeg": b"data:image/jpeg;base64,",
+    ".png": b"data:image/png;base64,",
+    ".gif": b"data:image/gif;base64,",
+    ".webp": b"data:image/webp;base64,",
+}
+
+# Shared OpenAI client so connections (and TLS sessions) are reused
+# across image analyses; created on first use
+_openai_client: Optional[openai.AsyncOpenAI] = None
+
+
+def _get_openai_client() -> openai.AsyncOpenAI:
+    """Get the shared OpenAI client, creating it if needed."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20
+                )
+            )
+        )
+    return _openai_client
+
+
+async def aclose_openai_client() -> None:
+    """Close the shared OpenAI client and its connections, if one was made."""
+    global _openai_client
+    if _openai_client is not None:
+        client, _openai_client = _openai_client, None
+        await client.close()
+
 
 class ImageService:
     """Service for managing image uploads and analysis."""
@@ -155,28 +195,19 @@ class ImageService:
             return False, "No image found for this upload"
         
         try:
-            # Read the image
-            with open(request.image_path, "rb") as f:
-                image_data = f.read()
-            
-            # Encode as base64
-            image_base64 = base64.b64encode(image_data).decode("utf-8")
-            
-            # Determine the media type
+            # Build the data URI directly from the encoded bytes
             ext = Path(request.image_path).suffix.lower()
-            media_types = {
-                ".jpg": "image/jpeg",
-                ".jpeg": "image/jpeg",
-                ".png": "image/png",
-                ".gif": "image/gif",
-                ".webp": "image/webp"
-            }
-            media_type = media_types.get(ext, "image/jpeg")
+            prefix = _DATA_URI_PREFIX.get(ext, _DATA_URI_PREFIX[".jpg"])
+            
+            # Encode as base64 straight from the page cache; mapping the
+            # file avoids holding a second full copy of the image in memory
+            with open(request.image_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    image_url = (prefix + base64.b64encode(mm)).decode("ascii")
             
             # Call GPT-4 Vision for analysis
             analysis = await self._call_vision_api(
-                image_base64,
-                media_type,
+                image_url,
                 request.appliance_type,
                 request.issue_description
             )
@@ -193,16 +224,12 @@ class ImageService:
     
     async def _call_vision_api(
         self,
-        image_base64: str,
-        media_type: str,
+        image_url: str,
         appliance_type: Optional[str],
         issue_description: Optional[str]
     ) -> str:
         """Call GPT-4 Vision API to analyze the appliance image."""
-        
-        import openai
-        
-        client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        client = _get_openai_client()
         
         # Build the context
         context = "You are an expert appliance technician analyzing an image."
@@ -231,9 +258,7 @@ Be specific and technical where appropriate, but explain in terms a homeowner ca
                             {"type": "text", "text": prompt},
                             {
                                 "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{media_type};base64,{image_base64}"
-                                }
+                                "image_url": {"url": image_url}
                             }
                         ]
                     }
@@ -2,8 +2,9 @@
 
 import secrets
 import string
+from enum import IntEnum
 from typing import List, Optional, Tuple
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
 
@@ -19,6 +20,58 @@ from app.models.availability import AppointmentStatus
 from app.schemas.appointment import AvailableSlotResponse
 
 
+# Name tables for formatting dates without going through strftime
+_DAY_NAMES = (
+    "Monday", "Tuesday", "Wednesday", "Thursday",
+    "Friday", "Saturday", "Sunday"
+)
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December"
+)
+
+# Confirmation numbers are "SHS-" followed by 8 base-36 characters
+_CONFIRMATION_ALPHABET = string.ascii_uppercase + string.digits
+_CONFIRMATION_LENGTH = 8
+_CONFIRMATION_SPACE = len(_CONFIRMATION_ALPHABET) ** _CONFIRMATION_LENGTH
+
+
+class TimePreference(IntEnum):
+    """Preferred time of day for an appointment."""
+    ANY = 0
+    MORNING = 1
+    AFTERNOON = 2
+
+
+_TIME_PREFERENCES = {
+    "any": TimePreference.ANY,
+    "morning": TimePreference.MORNING,
+    "afternoon": TimePreference.AFTERNOON,
+}
+
+# Morning slots start before noon, afternoon slots at or after it
+_NOON = time(12, 0)
+
+
+def parse_time_preference(value: Optional[str]) -> TimePreference:
+    """Convert a time-of-day string to a TimePreference; unknown means ANY."""
+    if not value:
+        return TimePreference.ANY
+    return _TIME_PREFERENCES.get(value.strip().lower(), TimePreference.ANY)
+
+
+def format_slot_date(value: date) -> str:
+    """Format a date as e.g. "Monday, October 06"."""
+    return f"{_DAY_NAMES[value.weekday()]}, {_MONTH_NAMES[value.month - 1]} {value.day:02d}"
+
+
+def format_slot_time(value: time) -> str:
+    """Format a time as e.g. "9:00 AM"."""
+    hour = value.hour % 12 or 12
+    meridiem = "AM" if value.hour < 12 else "PM"
+    return f"{hour}:{value.minute:02d} {meridiem}"
+
+
 class SchedulingService:
     """Service class for scheduling operations."""
     
@@ -27,12 +80,13 @@ class SchedulingService:
     
     def _generate_confirmation_number(self) -> str:
         """Generate a unique confirmation number."""
-        prefix = "SHS"
-        random_part = ''.join(
-            secrets.choice(string.ascii_uppercase + string.digits) 
-            for _ in range(8)
-        )
-        return f"{prefix}-{random_part}"
+        # One draw from the OS CSPRNG, then base-36 encode it
+        value = secrets.randbelow(_CONFIRMATION_SPACE)
+        chars = []
+        for _ in range(_CONFIRMATION_LENGTH):
+            value, index = divmod(value, len(_CONFIRMATION_ALPHABET))
+            chars.append(_CONFIRMATION_ALPHABET[index])
+        return "SHS-" + "".join(chars)
     
     def get_available_slots(
         self,
@@ -40,7 +94,7 @@ class SchedulingService:
         appliance_type: str,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        time_preference: Optional[str] = None  # "morning", "afternoon", "any"
+        time_preference: TimePreference = TimePreference.ANY
     ) -> List[AvailableSlotResponse]:
         """
         Find available time slots matching the criteria.
@@ -76,12 +130,10 @@ class SchedulingService:
         )
         
         # Apply time preference filter
-        if time_preference == "morning":
-            from datetime import time as dt_time
-            query = query.filter(TimeSlot.start_time < dt_time(12, 0))
-        elif time_preference == "afternoon":
-            from datetime import time as dt_time
-            query = query.filter(TimeSlot.start_time >= dt_time(12, 0))
+        if time_preference == TimePreference.MORNING:
+            query = query.filter(TimeSlot.start_time < _NOON)
+        elif time_preference == TimePreference.AFTERNOON:
+            query = query.filter(TimeSlot.start_time >= _NOON)
         
         # Order by date and time
         query = query.order_by(TimeSlot.date, TimeSlot.start_time)
@@ -239,11 +291,11 @@ class SchedulingService:
         technician = appointment.technician
         
         # Format time nicely
-        start_time = slot.start_time.strftime("%I:%M %p").lstrip("0")
-        end_time = slot.end_time.strftime("%I:%M %p").lstrip("0")
+        start_time = format_slot_time(slot.start_time)
+        end_time = format_slot_time(slot.end_time)
         
         # Format date nicely
-        date_str = slot.date.strftime("%A, %B %d")
+        date_str = format_slot_date(slot.date)
         
         return {
             "confirmation_number": appointment.confirmation_number,
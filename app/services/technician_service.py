@@ -2,7 +2,7 @@
 
 from typing import List, Optional
 from datetime import date
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_
 
 from app.models import Technician, TechnicianSpecialty, TechnicianServiceArea, TimeSlot
@@ -52,37 +52,42 @@ class TechnicianService:
         - Are certified for the appliance type
         - Have availability on the target date (if specified)
         """
-        # Start with base query
-        query = self.db.query(Technician).filter(Technician.is_active == True)
+        # Phase 1: resolve matching technician ids. Keeping the DISTINCT on
+        # a single narrow column avoids de-duplicating wide joined rows.
+        id_query = self.db.query(Technician.id).filter(Technician.is_active == True)
         
         # Join and filter by service area
-        query = query.join(TechnicianServiceArea).filter(
+        id_query = id_query.join(TechnicianServiceArea).filter(
             TechnicianServiceArea.zip_code == zip_code
         )
         
         # Join and filter by specialty
-        query = query.join(Technician.specialties).filter(
+        id_query = id_query.join(Technician.specialties).filter(
             TechnicianSpecialty.appliance_type == appliance_type
         )
         
         # If a date is specified, check for availability
         if target_date:
-            query = query.join(Technician.time_slots).filter(
-                and_(
-                    TimeSlot.date == target_date,
-                    TimeSlot.is_available == True,
-                    TimeSlot.is_blocked == False
+            id_query = id_query.filter(
+                Technician.time_slots.any(
+                    and_(
+                        TimeSlot.date == target_date,
+                        TimeSlot.is_available == True,
+                        TimeSlot.is_blocked == False
+                    )
                 )
             )
         
-        # Eager load relationships
-        query = query.options(
-            joinedload(Technician.specialties),
-            joinedload(Technician.service_areas),
-            joinedload(Technician.time_slots)
-        )
+        technician_ids = [row.id for row in id_query.distinct()]
+        if not technician_ids:
+            return []
         
-        return query.distinct().all()
+        # Phase 2: load the technicians, with one IN query per collection
+        return self.db.query(Technician).options(
+            selectinload(Technician.specialties),
+            selectinload(Technician.service_areas),
+            selectinload(Technician.time_slots)
+        ).filter(Technician.id.in_(technician_ids)).all()
     
     def get_all_specialties(self) -> List[TechnicianSpecialty]:
         """Get all available appliance specialties."""
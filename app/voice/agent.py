@@ -1,13 +1,22 @@
 """Voice AI Agent with conversation logic and tool calling."""
 
 import json
+import asyncio
+from itertools import islice
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Awaitable, Callable, FrozenSet, Optional, Tuple
 from datetime import date, timedelta
 
+import orjson
+
 from app.config import settings
 from app.schemas.conversation import ConversationState, ConversationPhase, DiagnosticInfo
 from app.services import DiagnosticService, SchedulingService, CustomerService, ImageService
+from app.services.scheduling_service import (
+    format_slot_date,
+    format_slot_time,
+    parse_time_preference,
+)
 from app.database import get_db_context
 
 logger = logging.getLogger(__name__)
@@ -59,6 +68,153 @@ Use these tools when appropriate, but always explain what you're doing in natura
 """
 
 
+# Tool definitions exposed to the model; static, so built once at import
+_TOOLS: Tuple[Dict[str, Any], ...] = (
+    {
+        "type": "function",
+        "name": "get_troubleshooting_steps",
+        "description": "Get troubleshooting steps for a specific appliance issue. Use this to guide the customer through basic fixes before scheduling a technician.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "appliance_type": {
+                    "type": "string",
+                    "description": "The type of appliance (washer, dryer, refrigerator, dishwasher, oven, hvac, etc.)"
+                },
+                "symptom": {
+                    "type": "string",
+                    "description": "The main symptom or issue the customer is experiencing"
+                }
+            },
+            "required": ["appliance_type", "symptom"]
+        }
+    },
+    {
+        "type": "function",
+        "name": "check_technician_availability",
+        "description": "Check available appointment slots for a technician visit. Use this when the customer needs to schedule a service call.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "zip_code": {
+                    "type": "string",
+                    "description": "The customer's 5-digit zip code"
+                },
+                "appliance_type": {
+                    "type": "string",
+                    "description": "The type of appliance that needs service"
+                },
+                "preferred_time": {
+                    "type": "string",
+                    "enum": ["morning", "afternoon", "any"],
+                    "description": "Customer's preferred time of day for the appointment"
+                }
+            },
+            "required": ["zip_code", "appliance_type"]
+        }
+    },
+    {
+        "type": "function",
+        "name": "book_appointment",
+        "description": "Book a technician appointment. Only use this after confirming the date and time with the customer.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "slot_id": {
+                    "type": "integer",
+                    "description": "The ID of the time slot to book"
+                },
+                "customer_name": {
+                    "type": "string",
+                    "description": "The customer's full name"
+                },
+                "customer_zip_code": {
+                    "type": "string",
+                    "description": "The customer's zip code"
+                },
+                "appliance_type": {
+                    "type": "string",
+                    "description": "The type of appliance"
+                },
+                "issue_description": {
+                    "type": "string",
+                    "description": "Brief description of the issue"
+                }
+            },
+            "required": ["slot_id", "customer_name", "appliance_type", "issue_description"]
+        }
+    },
+    {
+        "type": "function",
+        "name": "request_image_upload",
+        "description": "Send the customer a link to upload a photo of their appliance. Use this when a visual would help diagnose the issue.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "email": {
+                    "type": "string",
+                    "description": "The customer's email address to send the upload link"
+                },
+                "appliance_type": {
+                    "type": "string",
+                    "description": "The type of appliance to photograph"
+                },
+                "specific_area": {
+                    "type": "string",
+                    "description": "Specific area or part to photograph (optional)"
+                }
+            },
+            "required": ["email"]
+        }
+    },
+    {
+        "type": "function",
+        "name": "update_customer_info",
+        "description": "Update the customer's information in the system.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Customer's name"
+                },
+                "email": {
+                    "type": "string",
+                    "description": "Customer's email address"
+                },
+                "zip_code": {
+                    "type": "string",
+                    "description": "Customer's zip code"
+                },
+                "address": {
+                    "type": "string",
+                    "description": "Customer's street address"
+                }
+            }
+        }
+    },
+)
+
+# Serialized once so session setup can send the schema without re-encoding
+_TOOLS_JSON: bytes = orjson.dumps(_TOOLS)
+
+# Required argument names per tool, checked before dispatching a call
+_REQUIRED_ARGS: Dict[str, FrozenSet[str]] = {
+    tool["name"]: frozenset(tool["parameters"].get("required", ()))
+    for tool in _TOOLS
+}
+
+
+# Read-only knowledge base service, shared by every agent instance
+_DIAGNOSTIC_SERVICE = DiagnosticService()
+
+
+def _split_name(name: str) -> Tuple[str, str]:
+    """Split a full name into (first, last); last is empty if not given."""
+    first, _, last = name.strip().partition(" ")
+    return first or name, last.strip()
+
+
 class VoiceAgent:
     """
     AI Agent for handling voice conversations about appliance diagnosis.
@@ -68,163 +224,94 @@ class VoiceAgent:
     """
     
     def __init__(self):
-        self.diagnostic_service = DiagnosticService()
-    
-    def get_system_prompt(self, session: ConversationState) -> str:
-        """Get the system prompt with current session context."""
-        context_parts = [SYSTEM_PROMPT]
+        self.diagnostic_service = _DIAGNOSTIC_SERVICE
         
-        # Add current conversation context
-        if session.key_facts:
-            context_parts.append("\n## Current Conversation Context")
-            for fact in session.key_facts:
-                context_parts.append(f"- {fact}")
+        # Tool name -> handler taking (arguments, session)
+        self._dispatch: Dict[str, Callable[..., Awaitable[str]]] = {
+            "get_troubleshooting_steps": lambda args, session: self._get_troubleshooting(
+                args["appliance_type"],
+                args["symptom"]
+            ),
+            "check_technician_availability": lambda args, session: asyncio.to_thread(
+                self._check_availability,
+                args["zip_code"],
+                args["appliance_type"],
+                args.get("preferred_time", "any"),
+                session
+            ),
+            "book_appointment": lambda args, session: asyncio.to_thread(
+                self._book_appointment,
+                args["slot_id"],
+                args["customer_name"],
+                args.get("customer_zip_code", session.scheduling.customer_zip_code),
+                args["appliance_type"],
+                args["issue_description"],
+                session
+            ),
+            "request_image_upload": lambda args, session: asyncio.to_thread(
+                self._request_image,
+                args["email"],
+                args.get("appliance_type", session.diagnostic.appliance_type),
+                args.get("specific_area"),
+                session
+            ),
+            "update_customer_info": lambda args, session: asyncio.to_thread(
+                self._update_customer, args, session
+            ),
+        }
+    
+    def get_static_prompt(self) -> str:
+        """
+        Get the fixed part of the system prompt.
         
-        # Add diagnostic info if gathered
+        This never varies between calls or turns, so it is sent once as the
+        session instructions and stays a cacheable prefix for the model.
+        """
+        return SYSTEM_PROMPT
+    
+    def get_dynamic_context(self, session: ConversationState) -> str:
+        """Get the session-specific context, or "" if nothing is known yet."""
         diag = session.diagnostic
-        if diag.appliance_type:
-            context_parts.append(f"\nAppliance: {diag.appliance_type}")
-        if diag.primary_symptom:
-            context_parts.append(f"Main Issue: {diag.primary_symptom}")
-        if diag.additional_symptoms:
-            context_parts.append(f"Other Symptoms: {', '.join(diag.additional_symptoms)}")
-        
-        # Add scheduling info if gathered
         sched = session.scheduling
-        if sched.customer_zip_code:
-            context_parts.append(f"Customer Zip Code: {sched.customer_zip_code}")
-        if sched.customer_name:
-            context_parts.append(f"Customer Name: {sched.customer_name}")
         
-        return "\n".join(context_parts)
+        # Current conversation context
+        facts_block = (
+            "\n\n## Current Conversation Context\n- " + "\n- ".join(session.key_facts)
+            if session.key_facts else ""
+        )
+        
+        # Diagnostic info if gathered
+        appliance_block = f"\n\nAppliance: {diag.appliance_type}" if diag.appliance_type else ""
+        issue_block = f"\nMain Issue: {diag.primary_symptom}" if diag.primary_symptom else ""
+        symptoms_block = (
+            f"\nOther Symptoms: {', '.join(diag.additional_symptoms)}"
+            if diag.additional_symptoms else ""
+        )
+        
+        # Scheduling info if gathered
+        zip_block = f"\nCustomer Zip Code: {sched.customer_zip_code}" if sched.customer_zip_code else ""
+        name_block = f"\nCustomer Name: {sched.customer_name}" if sched.customer_name else ""
+        
+        context = (
+            f"{facts_block}{appliance_block}{issue_block}"
+            f"{symptoms_block}{zip_block}{name_block}"
+        )
+        return context.lstrip("\n")
+    
+    def get_system_prompt(self, session: ConversationState) -> str:
+        """Get the system prompt with current session context."""
+        context = self.get_dynamic_context(session)
+        if not context:
+            return SYSTEM_PROMPT
+        return f"{SYSTEM_PROMPT}\n{context}"
     
     def get_tools(self) -> List[Dict[str, Any]]:
         """Get the tool definitions for the AI agent."""
-        return [
-            {
-                "type": "function",
-                "name": "get_troubleshooting_steps",
-                "description": "Get troubleshooting steps for a specific appliance issue. Use this to guide the customer through basic fixes before scheduling a technician.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "appliance_type": {
-                            "type": "string",
-                            "description": "The type of appliance (washer, dryer, refrigerator, dishwasher, oven, hvac, etc.)"
-                        },
-                        "symptom": {
-                            "type": "string",
-                            "description": "The main symptom or issue the customer is experiencing"
-                        }
-                    },
-                    "required": ["appliance_type", "symptom"]
-                }
-            },
-            {
-                "type": "function",
-                "name": "check_technician_availability",
-                "description": "Check available appointment slots for a technician visit. Use this when the customer needs to schedule a service call.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "zip_code": {
-                            "type": "string",
-                            "description": "The customer's 5-digit zip code"
-                        },
-                        "appliance_type": {
-                            "type": "string",
-                            "description": "The type of appliance that needs service"
-                        },
-                        "preferred_time": {
-                            "type": "string",
-                            "enum": ["morning", "afternoon", "any"],
-                            "description": "Customer's preferred time of day for the appointment"
-                        }
-                    },
-                    "required": ["zip_code", "appliance_type"]
-                }
-            },
-            {
-                "type": "function",
-                "name": "book_appointment",
-                "description": "Book a technician appointment. Only use this after confirming the date and time with the customer.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "slot_id": {
-                            "type": "integer",
-                            "description": "The ID of the time slot to book"
-                        },
-                        "customer_name": {
-                            "type": "string",
-                            "description": "The customer's full name"
-                        },
-                        "customer_zip_code": {
-                            "type": "string",
-                            "description": "The customer's zip code"
-                        },
-                        "appliance_type": {
-                            "type": "string",
-                            "description": "The type of appliance"
-                        },
-                        "issue_description": {
-                            "type": "string",
-                            "description": "Brief description of the issue"
-                        }
-                    },
-                    "required": ["slot_id", "customer_name", "appliance_type", "issue_description"]
-                }
-            },
-            {
-                "type": "function",
-                "name": "request_image_upload",
-                "description": "Send the customer a link to upload a photo of their appliance. Use this when a visual would help diagnose the issue.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "email": {
-                            "type": "string",
-                            "description": "The customer's email address to send the upload link"
-                        },
-                        "appliance_type": {
-                            "type": "string",
-                            "description": "The type of appliance to photograph"
-                        },
-                        "specific_area": {
-                            "type": "string",
-                            "description": "Specific area or part to photograph (optional)"
-                        }
-                    },
-                    "required": ["email"]
-                }
-            },
-            {
-                "type": "function",
-                "name": "update_customer_info",
-                "description": "Update the customer's information in the system.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Customer's name"
-                        },
-                        "email": {
-                            "type": "string",
-                            "description": "Customer's email address"
-                        },
-                        "zip_code": {
-                            "type": "string",
-                            "description": "Customer's zip code"
-                        },
-                        "address": {
-                            "type": "string",
-                            "description": "Customer's street address"
-                        }
-                    }
-                }
-            }
-        ]
+        return list(_TOOLS)
+    
+    def get_tools_json(self) -> bytes:
+        """Get the tool definitions pre-serialized as JSON."""
+        return _TOOLS_JSON
     
     async def execute_tool(
         self,
@@ -232,51 +319,28 @@ class VoiceAgent:
         arguments: Dict[str, Any],
         session: ConversationState
     ) -> str:
-        """Execute a tool call and return the result."""
+        """
+        Execute a tool call and return the result.
         
-        logger.info(f"Executing tool: {tool_name} with args: {arguments}")
+        Tools that hit the database run in a worker thread, each with its
+        own database session, so the event loop keeps streaming audio
+        meanwhile.
+        """
+        
+        logger.info("Executing tool: %s with args: %s", tool_name, arguments)
+        
+        handler = self._dispatch.get(tool_name)
+        if handler is None:
+            return f"Unknown tool: {tool_name}"
+        
+        missing = _REQUIRED_ARGS[tool_name].difference(arguments)
+        if missing:
+            return f"Missing required arguments for {tool_name}: {', '.join(sorted(missing))}"
         
         try:
-            if tool_name == "get_troubleshooting_steps":
-                return await self._get_troubleshooting(
-                    arguments["appliance_type"],
-                    arguments["symptom"]
-                )
-            
-            elif tool_name == "check_technician_availability":
-                return await self._check_availability(
-                    arguments["zip_code"],
-                    arguments["appliance_type"],
-                    arguments.get("preferred_time", "any"),
-                    session
-                )
-            
-            elif tool_name == "book_appointment":
-                return await self._book_appointment(
-                    arguments["slot_id"],
-                    arguments["customer_name"],
-                    arguments.get("customer_zip_code", session.scheduling.customer_zip_code),
-                    arguments["appliance_type"],
-                    arguments["issue_description"],
-                    session
-                )
-            
-            elif tool_name == "request_image_upload":
-                return await self._request_image(
-                    arguments["email"],
-                    arguments.get("appliance_type", session.diagnostic.appliance_type),
-                    arguments.get("specific_area"),
-                    session
-                )
-            
-            elif tool_name == "update_customer_info":
-                return await self._update_customer(arguments, session)
-            
-            else:
-                return f"Unknown tool: {tool_name}"
-                
+            return await handler(arguments, session)
         except Exception as e:
-            logger.error(f"Tool execution error: {str(e)}")
+            logger.error("Tool execution error: %s", e)
             return f"I encountered an issue while processing that. Let me try another approach."
     
     async def _get_troubleshooting(
@@ -285,17 +349,19 @@ class VoiceAgent:
         symptom: str
     ) -> str:
         """Get troubleshooting steps for an issue."""
+        # The step lookup itself is cached by the diagnostic service
         steps = self.diagnostic_service.get_troubleshooting_steps(
             appliance_type, symptom
         )
         
         if steps:
-            formatted_steps = "\n".join(f"- {step}" for step in steps[:5])
+            # Only the first few steps are read out; don't copy the rest
+            formatted_steps = "\n".join(f"- {step}" for step in islice(steps, 5))
             return f"Troubleshooting steps for {appliance_type} with '{symptom}':\n{formatted_steps}"
         else:
             return f"I don't have specific troubleshooting steps for that issue, but general steps like checking power and resetting the appliance may help."
     
-    async def _check_availability(
+    def _check_availability(
         self,
         zip_code: str,
         appliance_type: str,
@@ -307,14 +373,12 @@ class VoiceAgent:
             scheduling_service = SchedulingService(db)
             
             # Normalize appliance type
-            normalized_type = self.diagnostic_service.normalize_appliance_type(appliance_type)
-            if not normalized_type:
-                normalized_type = appliance_type.lower()
+            normalized_type = self.diagnostic_service.normalize_appliance_type(appliance_type) or appliance_type.lower()
             
             slots = scheduling_service.get_available_slots(
                 zip_code=zip_code,
                 appliance_type=normalized_type,
-                time_preference=preferred_time if preferred_time != "any" else None
+                time_preference=parse_time_preference(preferred_time)
             )
             
             if not slots:
@@ -323,20 +387,24 @@ class VoiceAgent:
             # Store in session for booking
             session.scheduling.customer_zip_code = zip_code
             
-            # Format the first few available slots
+            # Format the first few available slots as compact rows; the
+            # model re-reads this on the next turn, so fewer tokens help
             slot_descriptions = []
-            for i, slot in enumerate(slots[:5]):
-                date_str = slot.date.strftime("%A, %B %d")
-                start_str = slot.start_time.strftime("%I:%M %p").lstrip("0")
-                end_str = slot.end_time.strftime("%I:%M %p").lstrip("0")
+            for slot in slots[:5]:
+                date_str = format_slot_date(slot.date)
+                start_str = format_slot_time(slot.start_time)
+                end_str = format_slot_time(slot.end_time)
                 slot_descriptions.append(
-                    f"Slot {slot.slot_id}: {date_str} from {start_str} to {end_str} with {slot.technician_name}"
+                    f"{slot.slot_id}|{date_str}|{start_str}-{end_str}|{slot.technician_name}"
                 )
             
-            result = f"Available appointments in {zip_code}:\n" + "\n".join(slot_descriptions)
+            result = (
+                f"Available appointments in {zip_code}:\n"
+                "slot_id|date|window|technician\n" + "\n".join(slot_descriptions)
+            )
             return result
     
-    async def _book_appointment(
+    def _book_appointment(
         self,
         slot_id: int,
         customer_name: str,
@@ -354,9 +422,7 @@ class VoiceAgent:
             customer_id = session.customer_id
             if customer_id:
                 # Update customer with name
-                parts = customer_name.split(None, 1)
-                first_name = parts[0] if parts else customer_name
-                last_name = parts[1] if len(parts) > 1 else ""
+                first_name, last_name = _split_name(customer_name)
                 
                 customer_service.update_customer(
                     customer_id,
@@ -366,9 +432,7 @@ class VoiceAgent:
                 )
             
             # Normalize appliance type
-            normalized_type = self.diagnostic_service.normalize_appliance_type(appliance_type)
-            if not normalized_type:
-                normalized_type = appliance_type.lower()
+            normalized_type = self.diagnostic_service.normalize_appliance_type(appliance_type) or appliance_type.lower()
             
             # Book the appointment
             appointment, error = scheduling_service.book_appointment(
@@ -389,6 +453,7 @@ class VoiceAgent:
             
             # Get formatted details
             details = scheduling_service.format_appointment_details(appointment)
+            session.appointment_details = details
             
             return (
                 f"Appointment booked successfully!\n"
@@ -399,7 +464,7 @@ class VoiceAgent:
                 f"Service: {details['appliance_type']} - {details['issue_description']}"
             )
     
-    async def _request_image(
+    def _request_image(
         self,
         email: str,
         appliance_type: Optional[str],
@@ -433,7 +498,7 @@ class VoiceAgent:
             
             return instructions
     
-    async def _update_customer(
+    def _update_customer(
         self,
         updates: Dict[str, Any],
         session: ConversationState
@@ -446,9 +511,9 @@ class VoiceAgent:
                 # Parse name if provided
                 update_kwargs = {}
                 if "name" in updates:
-                    parts = updates["name"].split(None, 1)
-                    update_kwargs["first_name"] = parts[0] if parts else updates["name"]
-                    update_kwargs["last_name"] = parts[1] if len(parts) > 1 else None
+                    first_name, last_name = _split_name(updates["name"])
+                    update_kwargs["first_name"] = first_name
+                    update_kwargs["last_name"] = last_name or None
                     session.scheduling.customer_name = updates["name"]
                 
                 if "email" in updates:
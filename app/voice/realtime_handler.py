@@ -1,11 +1,17 @@
 """Handler for OpenAI Realtime API WebSocket connections."""
 
-import json
 import base64
 import logging
 import asyncio
-from typing import Optional, Callable, Any
+import functools
+import socket
+import ssl
+from collections import deque
+from typing import Awaitable, Deque, Optional, Callable, Any, Set, Tuple
+import orjson
 import websockets
+from websockets.asyncio.client import ClientConnection
+from websockets.protocol import State
 
 from app.config import settings
 from app.voice.agent import VoiceAgent
@@ -16,6 +22,269 @@ logger = logging.getLogger(__name__)
 
 OPENAI_REALTIME_URL = "wss://api.openai.com/v1/realtime"
 
+# Loading the CA bundle is costly, so every OpenAI connection shares one
+# client TLS context instead of building a default one per call
+_OPENAI_SSL_CONTEXT = ssl.create_default_context()
+
+# Audio deltas can exceed the 1 MiB websockets default
+OPENAI_MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+# Fixed parts of the audio envelope sent to OpenAI for every Twilio frame.
+# The payload is base64, which never needs JSON escaping.
+_AUDIO_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_AUDIO_APPEND_SUFFIX = '"}'
+_MEDIA_SUFFIX = '"}}'
+
+# Twilio media frames start with this and carry base64 under "payload"
+_TWILIO_MEDIA_START = '{"event":"media"'
+_PAYLOAD_KEY = '"payload":"'
+
+# Caller audio frames (20ms each) held while the OpenAI socket is slow;
+# past this the oldest frames are dropped rather than delaying live audio
+OPENAI_AUDIO_BACKLOG = 50
+
+# Pooled connections are replaced once this share of max idle time has
+# passed; failed opens are retried after POOL_RETRY_SECONDS, doubling
+POOL_RECYCLE_FRACTION = 0.8
+POOL_RETRY_SECONDS = 5.0
+
+# TCP keepalive for the OpenAI socket, so a dead peer is noticed in about
+# a minute instead of the kernel default of hours (idle, interval, count)
+_KEEPALIVE = (30, 15, 4)
+
+
+def _tune_socket(sock: Optional[socket.socket]) -> None:
+    """Send small audio frames immediately and detect dead peers early."""
+    if sock is None:
+        return
+    # asyncio normally sets TCP_NODELAY already; make sure of it
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # The keepalive timers are not available on every platform
+    idle, interval, count = _KEEPALIVE
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+    if hasattr(socket, "TCP_KEEPCNT"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count)
+
+
+# Sent after every tool result to have the model continue
+_RESPONSE_CREATE = '{"type":"response.create"}'
+
+
+@functools.lru_cache(maxsize=8)
+def _session_update_message(agent: VoiceAgent) -> str:
+    """Build the session.update event; it is the same for every call."""
+    return orjson.dumps({
+        "type": "session.update",
+        "session": {
+            "turn_detection": {
+                "type": "server_vad",
+                "threshold": 0.5,
+                "prefix_padding_ms": 300,
+                "silence_duration_ms": 500
+            },
+            "input_audio_format": "g711_ulaw",
+            "output_audio_format": "g711_ulaw",
+            "voice": settings.openai_voice,
+            "instructions": agent.get_static_prompt(),
+            "modalities": ["text", "audio"],
+            "temperature": 0.7,
+            "tools": orjson.Fragment(agent.get_tools_json()),
+            "tool_choice": "auto"
+        }
+    }).decode()
+
+
+@functools.lru_cache(maxsize=8)
+def _greeting_messages(agent: VoiceAgent) -> Tuple[str, str]:
+    """Build the greeting item and the response.create that voices it."""
+    # Create a conversation item with the greeting
+    greeting = orjson.dumps({
+        "type": "conversation.item.create",
+        "item": {
+            "type": "message",
+            "role": "assistant",
+            "content": [
+                {
+                    "type": "input_text",
+                    "text": agent.get_initial_message()
+                }
+            ]
+        }
+    }).decode()
+    
+    # Request a response to generate audio for the greeting
+    respond = orjson.dumps({
+        "type": "response.create",
+        "response": {
+            "modalities": ["audio", "text"]
+        }
+    }).decode()
+    
+    return greeting, respond
+
+
+def _media_payload(message: str) -> Optional[str]:
+    """
+    Pull the audio payload out of a Twilio media frame without parsing it.
+    
+    Returns None for any other event, or a frame laid out differently,
+    so the caller can fall back to a full JSON parse.
+    """
+    if not message.startswith(_TWILIO_MEDIA_START):
+        return None
+    start = message.find(_PAYLOAD_KEY)
+    if start < 0:
+        return None
+    start += len(_PAYLOAD_KEY)
+    # Base64 has no quotes or escapes, so the next quote ends it
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    return message[start:end]
+
+
+# Closes still in flight; holding them keeps the tasks from being collected
+_closing: Set[asyncio.Task] = set()
+
+
+async def _close_quietly(ws: ClientConnection) -> None:
+    """Close a connection, ignoring errors from an already broken one."""
+    try:
+        await ws.close()
+    except Exception:
+        pass
+
+
+def _close_in_background(ws: ClientConnection) -> None:
+    """Start closing a connection without waiting for the handshake."""
+    task = asyncio.create_task(_close_quietly(ws))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+async def _open_openai_connection() -> ClientConnection:
+    """Establish a new WebSocket connection to OpenAI Realtime API."""
+    headers = [
+        ("Authorization", f"Bearer {settings.openai_api_key}"),
+        ("OpenAI-Beta", "realtime=v1")
+    ]
+    
+    url = f"{OPENAI_REALTIME_URL}?model={settings.openai_realtime_model}"
+    
+    ws = await websockets.connect(
+        url,
+        additional_headers=headers,
+        ssl=_OPENAI_SSL_CONTEXT,
+        # Base64 audio doesn't deflate, so skip the zlib CPU and memory
+        compression=None,
+        max_size=OPENAI_MAX_MESSAGE_SIZE,
+        ping_interval=20,
+        ping_timeout=10
+    )
+    _tune_socket(ws.transport.get_extra_info("socket"))
+    return ws
+
+
+class RealtimeConnectionPool:
+    """
+    Keeps a few freshly opened OpenAI Realtime connections ready.
+    
+    A call takes a connection that has already done the TLS handshake and
+    HTTP upgrade, so only the session setup is left on its critical path.
+    Each Realtime connection carries its own conversation, so connections
+    are never returned to the pool after a call; a background task opens
+    new ones instead, and replaces idle ones before they get too old to
+    hand out.
+    """
+    
+    def __init__(self, size: int, max_idle_seconds: float):
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        # Replace connections with time to spare so acquire() never finds
+        # the whole pool expired after a quiet spell
+        self.recycle_seconds = max_idle_seconds * POOL_RECYCLE_FRACTION
+        self._idle: Deque[Tuple[float, ClientConnection]] = deque()
+        self._wakeup = asyncio.Event()
+        self._maintain_task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Begin warming connections in the background."""
+        if self.size <= 0 or not settings.openai_api_key:
+            return
+        if self._maintain_task is None or self._maintain_task.done():
+            self._maintain_task = asyncio.create_task(self._maintain())
+    
+    async def acquire(self) -> ClientConnection:
+        """Get a ready connection, opening one directly if none is idle."""
+        now = asyncio.get_running_loop().time()
+        while self._idle:
+            # Oldest first so none sits idle until it expires; one that has
+            # (or that the server closed) is discarded
+            opened_at, ws = self._idle.pop()
+            self._wakeup.set()
+            if ws.state is State.OPEN and now - opened_at < self.max_idle_seconds:
+                return ws
+            _close_in_background(ws)
+        
+        return await _open_openai_connection()
+    
+    async def close(self) -> None:
+        """Stop warming and close all idle connections."""
+        if self._maintain_task is not None:
+            self._maintain_task.cancel()
+            self._maintain_task = None
+        while self._idle:
+            _, ws = self._idle.pop()
+            await ws.close()
+    
+    def _discard_stale(self, now: float) -> None:
+        """Close idle connections that are due for replacement or already closed."""
+        fresh = deque()
+        for opened_at, ws in self._idle:
+            if ws.state is State.OPEN and now - opened_at < self.recycle_seconds:
+                fresh.append((opened_at, ws))
+            else:
+                _close_in_background(ws)
+        self._idle = fresh
+    
+    async def _maintain(self) -> None:
+        """Keep the pool full of connections younger than recycle_seconds."""
+        loop = asyncio.get_running_loop()
+        retry_delay = POOL_RETRY_SECONDS
+        while True:
+            self._wakeup.clear()
+            self._discard_stale(loop.time())
+            try:
+                while len(self._idle) < self.size:
+                    ws = await _open_openai_connection()
+                    self._idle.appendleft((loop.time(), ws))
+            except Exception as e:
+                # Calls still connect directly meanwhile; back off and retry
+                logger.warning(f"Could not pre-open OpenAI connection: {str(e)}")
+                delay = retry_delay
+                retry_delay = min(retry_delay * 2, self.recycle_seconds)
+            else:
+                retry_delay = POOL_RETRY_SECONDS
+                oldest_opened_at = self._idle[-1][0] if self._idle else loop.time()
+                delay = oldest_opened_at + self.recycle_seconds - loop.time()
+            
+            # Sleep until the oldest connection is due, or a call takes one
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+
+# Shared by every call handled by this process
+openai_pool = RealtimeConnectionPool(
+    settings.openai_pool_size,
+    settings.openai_pool_max_idle_seconds
+)
+
 
 class RealtimeHandler:
     """
@@ -32,9 +301,20 @@ class RealtimeHandler:
     ):
         self.session_manager = session_manager
         self.agent = agent
-        self.openai_ws: Optional[websockets.WebSocketClientProtocol] = None
+        self.openai_ws: Optional[ClientConnection] = None
         self.session: Optional[ConversationState] = None
         self.stream_sid: Optional[str] = None
+        
+        # Fixed start of the media envelope sent to Twilio, set with stream_sid
+        self._media_prefix: Optional[str] = None
+        
+        # Messages waiting for the Twilio writer task
+        self._twilio_queue: Deque[str] = deque()
+        self._twilio_ready = asyncio.Event()
+        
+        # Caller audio waiting for the OpenAI writer task
+        self._openai_audio: Deque[str] = deque(maxlen=OPENAI_AUDIO_BACKLOG)
+        self._openai_audio_ready = asyncio.Event()
     
     async def handle_twilio_connection(
         self,
@@ -49,7 +329,7 @@ class RealtimeHandler:
         2. Sets up the conversation session
         3. Bridges audio between Twilio and OpenAI
         """
-        self.session = await self.session_manager.get_session(call_sid)
+        self.session = self.session_manager.get_session(call_sid)
         
         if not self.session:
             logger.error(f"No session found for call {call_sid}")
@@ -70,9 +350,18 @@ class RealtimeHandler:
             tasks = [
                 asyncio.create_task(self._receive_from_twilio(twilio_ws)),
                 asyncio.create_task(self._receive_from_openai(twilio_ws)),
+                # FastAPI WebSocket uses send_text() instead of send()
+                asyncio.create_task(self._run_writer(
+                    self._twilio_queue, self._twilio_ready,
+                    twilio_ws.send_text, "Twilio"
+                )),
+                asyncio.create_task(self._run_writer(
+                    self._openai_audio, self._openai_audio_ready,
+                    self.openai_ws.send, "OpenAI"
+                )),
             ]
             
-            # Wait for either task to complete (connection closed)
+            # Wait for any task to complete (connection closed)
             done, pending = await asyncio.wait(
                 tasks,
                 return_when=asyncio.FIRST_COMPLETED
@@ -92,76 +381,44 @@ class RealtimeHandler:
             await self._cleanup()
     
     async def _connect_to_openai(self):
-        """Establish WebSocket connection to OpenAI Realtime API."""
-        headers = [
-            ("Authorization", f"Bearer {settings.openai_api_key}"),
-            ("OpenAI-Beta", "realtime=v1")
-        ]
-        
-        url = f"{OPENAI_REALTIME_URL}?model={settings.openai_realtime_model}"
-        
-        self.openai_ws = await websockets.connect(
-            url,
-            additional_headers=headers,
-            ping_interval=20,
-            ping_timeout=10
-        )
+        """Take a WebSocket connection to OpenAI Realtime API from the pool."""
+        self.openai_ws = await openai_pool.acquire()
         
         logger.info("Connected to OpenAI Realtime API")
     
+    async def _send_to_openai(self, event: dict):
+        """Serialize an event and send it to OpenAI as a text frame."""
+        await self.openai_ws.send(orjson.dumps(event).decode())
+    
     async def _configure_openai_session(self):
         """Configure the OpenAI Realtime session."""
-        session_config = {
-            "type": "session.update",
-            "session": {
-                "turn_detection": {
-                    "type": "server_vad",
-                    "threshold": 0.5,
-                    "prefix_padding_ms": 300,
-                    "silence_duration_ms": 500
-                },
-                "input_audio_format": "g711_ulaw",
-                "output_audio_format": "g711_ulaw",
-                "voice": settings.openai_voice,
-                "instructions": self.agent.get_system_prompt(self.session),
-                "modalities": ["text", "audio"],
-                "temperature": 0.7,
-                "tools": self.agent.get_tools(),
-                "tool_choice": "auto"
-            }
-        }
+        await self.openai_ws.send(_session_update_message(self.agent))
+        
+        # Session-specific context goes in its own system message so the
+        # instructions above stay identical across calls
+        context = self.agent.get_dynamic_context(self.session)
+        if context:
+            await self._send_to_openai({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "message",
+                    "role": "system",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": context
+                        }
+                    ]
+                }
+            })
         
-        await self.openai_ws.send(json.dumps(session_config))
         logger.info("OpenAI session configured")
     
     async def _send_initial_greeting(self):
         """Send the initial greeting to start the conversation."""
-        greeting = self.agent.get_initial_message()
-        
-        # Create a conversation item with the greeting
-        event = {
-            "type": "conversation.item.create",
-            "item": {
-                "type": "message",
-                "role": "assistant",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": greeting
-                    }
-                ]
-            }
-        }
-        
-        await self.openai_ws.send(json.dumps(event))
-        
-        # Request a response to generate audio for the greeting
-        await self.openai_ws.send(json.dumps({
-            "type": "response.create",
-            "response": {
-                "modalities": ["audio", "text"]
-            }
-        }))
+        greeting, respond = _greeting_messages(self.agent)
+        await self.openai_ws.send(greeting)
+        await self.openai_ws.send(respond)
     
     async def _receive_from_twilio(self, twilio_ws):
         """Receive audio from Twilio and forward to OpenAI."""
@@ -169,23 +426,35 @@ class RealtimeHandler:
             while True:
                 # FastAPI WebSocket uses receive_text() instead of async for
                 message = await twilio_ws.receive_text()
-                data = json.loads(message)
+                
+                # Nearly every frame is audio; forward it without parsing
+                audio_data = _media_payload(message)
+                if audio_data is not None:
+                    self._openai_audio.append(
+                        f"{_AUDIO_APPEND_PREFIX}{audio_data}{_AUDIO_APPEND_SUFFIX}"
+                    )
+                    self._openai_audio_ready.set()
+                    continue
+                
+                data = orjson.loads(message)
                 
                 if data["event"] == "start":
                     self.stream_sid = data["start"]["streamSid"]
+                    self._media_prefix = (
+                        '{"event":"media","streamSid":'
+                        f'{orjson.dumps(self.stream_sid).decode()},'
+                        '"media":{"payload":"'
+                    )
                     logger.info(f"Twilio stream started: {self.stream_sid}")
                 
                 elif data["event"] == "media":
                     # Forward audio to OpenAI
                     audio_data = data["media"]["payload"]
                     
-                    audio_event = {
-                        "type": "input_audio_buffer.append",
-                        "audio": audio_data
-                    }
-                    
-                    if self.openai_ws:
-                        await self.openai_ws.send(json.dumps(audio_event))
+                    self._openai_audio.append(
+                        f"{_AUDIO_APPEND_PREFIX}{audio_data}{_AUDIO_APPEND_SUFFIX}"
+                    )
+                    self._openai_audio_ready.set()
                 
                 elif data["event"] == "stop":
                     logger.info("Twilio stream stopped")
@@ -198,34 +467,34 @@ class RealtimeHandler:
     async def _receive_from_openai(self, twilio_ws):
         """Receive responses from OpenAI and forward audio to Twilio."""
         try:
-            async for message in self.openai_ws:
-                event = json.loads(message)
+            while True:
+                # Raw bytes skip a UTF-8 decode that orjson would redo anyway
+                message = await self.openai_ws.recv(decode=False)
+                event = orjson.loads(message)
                 event_type = event.get("type", "")
                 
                 if event_type == "response.audio.delta":
                     # Forward audio to Twilio
                     audio_data = event.get("delta", "")
                     
-                    if audio_data and self.stream_sid:
-                        media_message = {
-                            "event": "media",
-                            "streamSid": self.stream_sid,
-                            "media": {
-                                "payload": audio_data
-                            }
-                        }
-                        # FastAPI WebSocket uses send_text() instead of send()
-                        await twilio_ws.send_text(json.dumps(media_message))
+                    if audio_data and self._media_prefix:
+                        # One f-string is the only allocation per frame; a
+                        # reused buffer would still need copying to a str for
+                        # send_text, and each queued message must own its data
+                        self._twilio_queue.append(
+                            f"{self._media_prefix}{audio_data}{_MEDIA_SUFFIX}"
+                        )
+                        self._twilio_ready.set()
                 
                 elif event_type == "response.audio_transcript.done":
                     # Log the assistant's response
                     transcript = event.get("transcript", "")
-                    logger.info(f"Assistant: {transcript[:100]}...")
+                    logger.info("Assistant: %.100s...", transcript)
                 
                 elif event_type == "conversation.item.input_audio_transcription.completed":
                     # Log user's speech
                     transcript = event.get("transcript", "")
-                    logger.info(f"User: {transcript[:100]}...")
+                    logger.info("User: %.100s...", transcript)
                     
                     # Update session
                     if self.session:
@@ -250,14 +519,38 @@ class RealtimeHandler:
         except Exception as e:
             logger.error(f"Error receiving from OpenAI: {str(e)}")
     
+    async def _run_writer(
+        self,
+        queue: Deque[str],
+        ready: asyncio.Event,
+        send: Callable[[str], Awaitable[Any]],
+        peer: str
+    ):
+        """Drain queued messages to one peer from a single writer task."""
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                
+                # Messages that arrived back-to-back go out in one pass
+                while queue:
+                    await send(queue.popleft())
+                    
+        except websockets.exceptions.ConnectionClosed:
+            logger.info(f"{peer} connection closed")
+        except Exception as e:
+            if "disconnect" not in str(e).lower():
+                logger.error(f"Error sending to {peer}: {str(e)}")
+    
     async def _handle_tool_call(self, event: dict, twilio_ws):
         """Handle a function/tool call from OpenAI."""
         try:
             call_id = event.get("call_id")
             name = event.get("name")
-            arguments = json.loads(event.get("arguments", "{}"))
+            arguments = orjson.loads(event.get("arguments") or "{}")
             
-            logger.info(f"Tool call: {name}({arguments})")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tool call: %s(%s)", name, arguments)
             
             # Execute the tool
             result = await self.agent.execute_tool(name, arguments, self.session)
@@ -272,12 +565,10 @@ class RealtimeHandler:
                 }
             }
             
-            await self.openai_ws.send(json.dumps(tool_result))
+            await self._send_to_openai(tool_result)
             
             # Request a response based on the tool result
-            await self.openai_ws.send(json.dumps({
-                "type": "response.create"
-            }))
+            await self.openai_ws.send(_RESPONSE_CREATE)
             
         except Exception as e:
             logger.error(f"Error handling tool call: {str(e)}")
@@ -285,10 +576,8 @@ class RealtimeHandler:
     async def _cleanup(self):
         """Clean up connections."""
         if self.openai_ws:
-            try:
-                await self.openai_ws.close()
-            except:
-                pass
+            # The close handshake doesn't need to hold up call teardown
+            _close_in_background(self.openai_ws)
         
         if self.session:
-            await self.session_manager.update_session(self.session)
+            self.session_manager.update_session(self.session)
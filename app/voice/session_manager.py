@@ -1,24 +1,48 @@
 """Session management for voice conversations."""
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
+import msgpack
+
 from app.schemas.conversation import ConversationState, ConversationPhase
 
 logger = logging.getLogger(__name__)
 
+# Number of session shards; a power of two so a mask picks the shard
+SESSION_SHARDS = 16
+
+
+def _serialize(session: ConversationState) -> bytes:
+    """Pack a session into msgpack bytes for an external store."""
+    return msgpack.packb(session.model_dump(mode="json"), use_bin_type=True)
+
+
+def _deserialize(data: bytes) -> ConversationState:
+    """Rebuild a session from bytes produced by _serialize."""
+    return ConversationState.model_validate(msgpack.unpackb(data, raw=False))
+
 
 class SessionManager:
     """
     Manages conversation sessions for active calls.
     
     In production, this would use Redis or another distributed cache.
-    For this implementation, we use an in-memory store.
+    For this implementation, we use an in-memory store; lookups and
+    updates do no I/O, so they are plain methods rather than coroutines.
     """
     
     def __init__(self):
-        self._sessions: Dict[str, ConversationState] = {}
+        # Sessions are spread over several small dicts keyed by call SID, so
+        # no single dict has to grow (and resize) with every active call
+        self._shards: List[Dict[str, ConversationState]] = [
+            {} for _ in range(SESSION_SHARDS)
+        ]
+    
+    def _shard(self, call_sid: str) -> Dict[str, ConversationState]:
+        """Get the shard holding a call's session."""
+        return self._shards[hash(call_sid) & (SESSION_SHARDS - 1)]
     
     async def create_session(
         self,
@@ -35,43 +59,59 @@ class SessionManager:
             phase=ConversationPhase.GREETING
         )
         
-        self._sessions[call_sid] = session
+        self._shard(call_sid)[call_sid] = session
         logger.info(f"Created session for call {call_sid}")
         
         return session
     
-    async def get_session(self, call_sid: str) -> Optional[ConversationState]:
+    def get_session(self, call_sid: str) -> Optional[ConversationState]:
         """Get an existing session by call SID."""
-        return self._sessions.get(call_sid)
+        return self._shard(call_sid).get(call_sid)
     
-    async def update_session(self, session: ConversationState) -> None:
+    def update_session(self, session: ConversationState) -> None:
         """Update a session."""
         session.update_interaction()
-        self._sessions[session.call_sid] = session
+        self._shard(session.call_sid)[session.call_sid] = session
     
-    async def end_session(self, call_sid: str) -> Optional[ConversationState]:
+    def end_session(self, call_sid: str) -> Optional[ConversationState]:
         """End and remove a session."""
-        session = self._sessions.pop(call_sid, None)
+        session = self._shard(call_sid).pop(call_sid, None)
         if session:
             logger.info(f"Ended session for call {call_sid}")
         return session
     
-    async def get_active_sessions(self) -> Dict[str, ConversationState]:
+    def get_active_sessions(self) -> Dict[str, ConversationState]:
         """Get all active sessions."""
-        return self._sessions.copy()
+        sessions: Dict[str, ConversationState] = {}
+        for shard in self._shards:
+            sessions.update(shard)
+        return sessions
     
-    async def transition_phase(
+    def transition_phase(
         self,
         call_sid: str,
         new_phase: ConversationPhase
     ) -> Optional[ConversationState]:
         """Transition a session to a new phase."""
-        session = await self.get_session(call_sid)
+        session = self.get_session(call_sid)
         if session:
             old_phase = session.phase
             session.phase = new_phase
-            await self.update_session(session)
+            self.update_session(session)
             logger.info(
                 f"Session {call_sid}: {old_phase.value} -> {new_phase.value}"
             )
         return session
+    
+    def snapshot(self, call_sid: str) -> Optional[bytes]:
+        """Serialize a session for persisting outside this process."""
+        session = self.get_session(call_sid)
+        if session is None:
+            return None
+        return _serialize(session)
+    
+    def restore(self, data: bytes) -> ConversationState:
+        """Load a serialized session back into the manager."""
+        session = _deserialize(data)
+        self._shard(session.call_sid)[session.call_sid] = session
+        return session
@@ -4,6 +4,7 @@ Setup script for configuring Twilio webhooks.
 
 Usage:
     python scripts/setup_twilio.py --base-url https://your-ngrok-url.ngrok.io
+    python scripts/setup_twilio.py --base-url https://your-ngrok-url.ngrok.io --all
 
 This script will:
 1. Verify your Twilio credentials
@@ -13,6 +14,7 @@ This script will:
 
 import os
 import sys
+import asyncio
 import argparse
 from pathlib import Path
 
@@ -21,25 +23,31 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
     from twilio.rest import Client
+    from twilio.http.async_http_client import AsyncTwilioHttpClient
     from dotenv import load_dotenv
 except ImportError:
     print("Please install required packages: pip install twilio python-dotenv")
     sys.exit(1)
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Configure Twilio for Voice AI")
-    parser.add_argument(
-        "--base-url",
-        required=True,
-        help="Your public base URL (e.g., https://abc123.ngrok.io)"
-    )
-    parser.add_argument(
-        "--phone-number",
-        help="Specific phone number to configure (optional)"
-    )
-    args = parser.parse_args()
-    
+async def configure_number(number, voice_url: str, status_url: str) -> bool:
+    """Point one phone number's webhooks at the Voice AI server."""
+    try:
+        await number.update_async(
+            voice_url=voice_url,
+            voice_method="POST",
+            status_callback=status_url,
+            status_callback_method="POST"
+        )
+        print(f"  ✓ {number.phone_number}")
+        return True
+    except Exception as e:
+        print(f"  ✗ {number.phone_number}: {e}")
+        return False
+
+
+async def run(args) -> None:
+    """Verify credentials, then configure the selected numbers."""
     # Load environment variables
     load_dotenv()
     
@@ -50,25 +58,40 @@ def main():
         print("Error: TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN must be set in .env")
         sys.exit(1)
     
-    # Initialize client
-    client = Client(account_sid, auth_token)
+    # Initialize client; requests go out concurrently over aiohttp
+    http_client = AsyncTwilioHttpClient()
+    client = Client(account_sid, auth_token, http_client=http_client)
     
+    try:
+        await configure(client, account_sid, args)
+    finally:
+        await http_client.close()
+
+
+async def configure(client, account_sid: str, args) -> None:
+    """Do the actual configuration with an open client."""
     print("=" * 60)
     print("Twilio Voice AI Configuration")
     print("=" * 60)
     
-    # Verify credentials
-    try:
-        account = client.api.accounts(account_sid).fetch()
-        print(f"\n✓ Connected to Twilio account: {account.friendly_name}")
-    except Exception as e:
-        print(f"\n✗ Failed to connect to Twilio: {e}")
+    # Verify credentials and list phone numbers in parallel
+    account_result, numbers_result = await asyncio.gather(
+        client.api.accounts(account_sid).fetch_async(),
+        client.incoming_phone_numbers.list_async(limit=20),
+        return_exceptions=True
+    )
+    
+    if isinstance(account_result, Exception):
+        print(f"\n✗ Failed to connect to Twilio: {account_result}")
         sys.exit(1)
+    print(f"\n✓ Connected to Twilio account: {account_result.friendly_name}")
     
-    # List phone numbers
-    print("\nAvailable phone numbers:")
-    phone_numbers = client.incoming_phone_numbers.list(limit=20)
+    if isinstance(numbers_result, Exception):
+        print(f"\n✗ Failed to list phone numbers: {numbers_result}")
+        sys.exit(1)
+    phone_numbers = numbers_result
     
+    print("\nAvailable phone numbers:")
     if not phone_numbers:
         print("  No phone numbers found. Please purchase a phone number first.")
         sys.exit(1)
@@ -76,19 +99,21 @@ def main():
     for i, number in enumerate(phone_numbers, 1):
         print(f"  {i}. {number.phone_number} ({number.friendly_name})")
     
-    # Determine which number to configure
-    target_number = None
-    if args.phone_number:
-        for number in phone_numbers:
-            if number.phone_number == args.phone_number:
-                target_number = number
-                break
-        if not target_number:
+    # Determine which numbers to configure
+    if args.all:
+        target_numbers = phone_numbers
+        print(f"\nConfiguring all {len(target_numbers)} phone numbers")
+    elif args.phone_number:
+        target_numbers = [
+            number for number in phone_numbers
+            if number.phone_number == args.phone_number
+        ]
+        if not target_numbers:
             print(f"\n✗ Phone number {args.phone_number} not found")
             sys.exit(1)
     else:
-        target_number = phone_numbers[0]
-        print(f"\nUsing first phone number: {target_number.phone_number}")
+        target_numbers = phone_numbers[:1]
+        print(f"\nUsing first phone number: {target_numbers[0].phone_number}")
     
     # Configure webhook URLs
     voice_url = f"{args.base_url}/voice/incoming-call"
@@ -98,28 +123,49 @@ def main():
     print(f"  Voice URL: {voice_url}")
     print(f"  Status URL: {status_url}")
     
-    try:
-        target_number.update(
-            voice_url=voice_url,
-            voice_method="POST",
-            status_callback=status_url,
-            status_callback_method="POST"
-        )
-        print("\n✓ Webhook configuration updated successfully!")
-    except Exception as e:
-        print(f"\n✗ Failed to update webhook: {e}")
+    # One update per number, all in flight at once
+    results = await asyncio.gather(*(
+        configure_number(number, voice_url, status_url)
+        for number in target_numbers
+    ))
+    if not all(results):
+        print("\n✗ Failed to update webhook")
         sys.exit(1)
+    print("\n✓ Webhook configuration updated successfully!")
+    
+    configured = ", ".join(number.phone_number for number in target_numbers)
     
     print("\n" + "=" * 60)
     print("Configuration Complete!")
     print("=" * 60)
-    print(f"\nYour Voice AI agent is ready at: {target_number.phone_number}")
+    print(f"\nYour Voice AI agent is ready at: {configured}")
     print("\nTo test:")
     print(f"  1. Make sure your server is running at {args.base_url}")
-    print(f"  2. Call {target_number.phone_number}")
+    print(f"  2. Call {target_numbers[0].phone_number}")
     print("  3. Start talking to the AI agent!")
     print("\nNote: Update BASE_URL in your .env file to match your ngrok URL")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Configure Twilio for Voice AI")
+    parser.add_argument(
+        "--base-url",
+        required=True,
+        help="Your public base URL (e.g., https://abc123.ngrok.io)"
+    )
+    parser.add_argument(
+        "--phone-number",
+        help="Specific phone number to configure (optional)"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Configure every listed phone number"
+    )
+    args = parser.parse_args()
+    
+    asyncio.run(run(args))
+
+
 if __name__ == "__main__":
     main()
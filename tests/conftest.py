@@ -1,14 +1,49 @@
 """Pytest fixtures for testing."""
 
+import os
+import shutil
+import tempfile
+
+# The app seeds its own database on startup; give each process of this run
+# (the controller or an xdist worker) a fresh SQLite file in its own
+# directory, removed again in pytest_unconfigure, so runs never collide,
+# never reuse a stale schema and never touch a real DB. Set
+# unconditionally: workers inherit the controller's environment.
+_APP_DB_DIR = tempfile.mkdtemp(prefix="sears_test_")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_APP_DB_DIR, "app.db")
+
+# The app lifespan would otherwise pre-open OpenAI Realtime sockets for
+# any developer whose .env has an API key
+os.environ["OPENAI_POOL_SIZE"] = "0"
+
+from datetime import date, time, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import configure_mappers, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import get_db
-from app.models import Base
+from app.models import (
+    Base,
+    Technician,
+    TechnicianServiceArea,
+    TechnicianSpecialty,
+    TimeSlot,
+)
+from app.models.technician import technician_specialty_association
+from app.services import (
+    CustomerService,
+    DiagnosticService,
+    SchedulingService,
+    TechnicianService,
+)
+
+# Importing app.main above loads every model and service once per worker;
+# resolve the ORM relationships now rather than inside the first test
+configure_mappers()
 
 
 # Create test database (in-memory SQLite)
@@ -19,23 +54,73 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Commits inside a test only release a SAVEPOINT and nothing else writes
+# to the in-memory database, so loaded attributes cannot go stale; keep
+# them rather than re-SELECTing every object touched after a commit
+TestingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine
+)
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test."""
+# pysqlite manages transactions itself and would never emit SAVEPOINTs
+# correctly; take over BEGIN so each test can run in a rolled-back transaction
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+def pytest_unconfigure(config):
+    """Remove this process's app database directory."""
+    shutil.rmtree(_APP_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Provide the test engine, with the schema created once per run."""
     Base.metadata.create_all(bind=engine)
-    session = TestingSessionLocal()
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(db_engine):
+    """
+    Create a database session for each test.
+    
+    The session runs inside a transaction that is rolled back afterwards;
+    commits made by the code under test only release a SAVEPOINT.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(
+        bind=connection,
+        join_transaction_mode="create_savepoint"
+    )
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Start the application once for all API tests."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(app_client, db_session):
     """Create a test client with database override."""
     def override_get_db():
         try:
@@ -45,12 +130,91 @@ def client(db_session):
     
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as test_client:
-        yield test_client
+    yield app_client
     
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="class")
+def diag_service():
+    """Diagnostic service shared by a test class; it is read-only."""
+    return DiagnosticService()
+
+
+@pytest.fixture
+def customer_service(db_session):
+    """Customer service bound to the test's database session."""
+    return CustomerService(db_session)
+
+
+@pytest.fixture
+def sample_customer(customer_service):
+    """A customer already saved in the test database."""
+    return customer_service.get_or_create_customer("+15551234567")
+
+
+@pytest.fixture
+def scheduling_service(db_session):
+    """Scheduling service bound to the test's database session."""
+    return SchedulingService(db_session)
+
+
+@pytest.fixture
+def technician_service(db_session):
+    """Technician service bound to the test's database session."""
+    return TechnicianService(db_session)
+
+
+@pytest.fixture
+def sample_technicians(db_session):
+    """
+    Twenty active technicians serving 90210, with two slots each tomorrow.
+    
+    Every technician repairs washers and the even-numbered ones also repair
+    dryers. Each table is loaded with a single executemany INSERT inside
+    the test's transaction, so the rows roll back with it. Returns the
+    technician ids.
+    """
+    tech_ids = list(range(1, 21))
+    slot_date = date.today() + timedelta(days=1)
+    
+    db_session.execute(insert(TechnicianSpecialty), [
+        {"id": 1, "appliance_type": "washer"},
+        {"id": 2, "appliance_type": "dryer"},
+    ])
+    db_session.execute(insert(Technician), [
+        {
+            "id": tech_id,
+            "first_name": "Tech",
+            "last_name": f"{tech_id:02d}",
+            "email": f"tech{tech_id}@test.com",
+            "phone": "555-000-0000",
+            "employee_id": f"BULK{tech_id:03d}",
+        }
+        for tech_id in tech_ids
+    ])
+    db_session.execute(insert(technician_specialty_association), [
+        {"technician_id": tech_id, "specialty_id": specialty_id}
+        for tech_id in tech_ids
+        for specialty_id in ((1, 2) if tech_id % 2 == 0 else (1,))
+    ])
+    db_session.execute(insert(TechnicianServiceArea), [
+        {"technician_id": tech_id, "zip_code": "90210", "is_primary": True}
+        for tech_id in tech_ids
+    ])
+    db_session.execute(insert(TimeSlot), [
+        {
+            "technician_id": tech_id,
+            "date": slot_date,
+            "start_time": start,
+            "end_time": end,
+        }
+        for tech_id in tech_ids
+        for start, end in ((time(9), time(11)), (time(13), time(15)))
+    ])
+    return tech_ids
+
+
 @pytest.fixture
 def sample_technician_data():
     """Sample technician data for testing."""
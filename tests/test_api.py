@@ -1,10 +1,6 @@
 """Tests for API endpoints."""
 
 import pytest
-from fastapi.testclient import TestClient
-
-from app.models import Technician, TechnicianSpecialty, TechnicianServiceArea, TimeSlot
-from datetime import date, time, timedelta
 
 
 class TestHealthEndpoint:
@@ -51,6 +47,7 @@ class TestDiagnosticsEndpoint:
         assert len(data["troubleshooting_steps"]) > 0
 
 
+@pytest.mark.db
 class TestTechnicianEndpoints:
     """Tests for technician-related endpoints."""
     
@@ -69,6 +66,7 @@ class TestTechnicianEndpoints:
         assert data == []
 
 
+@pytest.mark.db
 class TestSchedulingEndpoints:
     """Tests for scheduling-related endpoints."""
     
@@ -86,6 +84,7 @@ class TestSchedulingEndpoints:
         assert data == []
 
 
+@pytest.mark.db
 class TestCustomerEndpoints:
     """Tests for customer-related endpoints."""
     
@@ -1,122 +1,143 @@
 """Tests for service layer."""
 
 import pytest
-from datetime import date, time, timedelta
+from datetime import date, datetime, time, timedelta
+from unittest.mock import MagicMock
 
-from app.services import DiagnosticService, CustomerService, SchedulingService
-from app.models import Customer, Technician, TechnicianSpecialty, TechnicianServiceArea, TimeSlot
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.services import SchedulingService
+from app.services.diagnostic_service import _match_symptom
+from app.services.scheduling_service import (
+    TimePreference,
+    format_slot_date,
+    format_slot_time,
+    parse_time_preference,
+)
+from app.schemas.conversation import ConversationPhase
+from app.voice.session_manager import SessionManager
+
+
+class _EmptyQuery:
+    """Query stand-in whose every chained call ends in no rows."""
+    
+    def join(self, *args, **kwargs):
+        return self
+    
+    filter = order_by = distinct = join
+    
+    def all(self):
+        return []
 
 
 class TestDiagnosticService:
     """Tests for the diagnostic service."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.service = DiagnosticService()
-    
-    def test_get_supported_appliances(self):
+    def test_get_supported_appliances(self, diag_service):
         """Test getting list of supported appliances."""
-        appliances = self.service.get_supported_appliances()
+        appliances = diag_service.get_supported_appliances()
         assert len(appliances) > 0
         assert "washer" in appliances
         assert "dryer" in appliances
         assert "refrigerator" in appliances
     
-    def test_normalize_appliance_type(self):
+    @pytest.mark.parametrize("raw,expected", [
+        ("washer", "washer"),
+        ("Washing Machine", "washer"),
+        ("fridge", "refrigerator"),
+        ("AC", "hvac"),
+        ("unknown", None),
+    ])
+    def test_normalize_appliance_type(self, diag_service, raw, expected):
         """Test appliance type normalization."""
-        assert self.service.normalize_appliance_type("washer") == "washer"
-        assert self.service.normalize_appliance_type("Washing Machine") == "washer"
-        assert self.service.normalize_appliance_type("fridge") == "refrigerator"
-        assert self.service.normalize_appliance_type("AC") == "hvac"
-        assert self.service.normalize_appliance_type("unknown") is None
+        assert diag_service.normalize_appliance_type(raw) == expected
     
-    def test_get_common_symptoms(self):
+    @pytest.mark.parametrize("appliance_type,symptom", [
+        ("washer", "won't start"),
+        ("dryer", "not heating"),
+        ("refrigerator", "not cooling"),
+        ("dishwasher", "not draining"),
+    ])
+    def test_get_common_symptoms(self, diag_service, appliance_type, symptom):
         """Test getting symptoms for appliance."""
-        symptoms = self.service.get_common_symptoms("washer")
+        symptoms = diag_service.get_common_symptoms(appliance_type)
         assert len(symptoms) > 0
-        assert "won't start" in symptoms
+        assert symptom in symptoms
     
-    def test_get_common_symptoms_unknown(self):
+    def test_get_common_symptoms_unknown(self, diag_service):
         """Test getting symptoms for unknown appliance."""
-        symptoms = self.service.get_common_symptoms("unknown_appliance")
-        assert symptoms == []
+        symptoms = diag_service.get_common_symptoms("unknown_appliance")
+        assert symptoms == ()
     
-    def test_get_troubleshooting_steps(self):
+    def test_get_troubleshooting_steps(self, diag_service):
         """Test getting troubleshooting steps."""
-        steps = self.service.get_troubleshooting_steps("washer", "won't start")
+        steps = diag_service.get_troubleshooting_steps("washer", "won't start")
         assert len(steps) > 0
     
-    def test_get_troubleshooting_steps_default(self):
+    def test_get_troubleshooting_steps_default(self, diag_service):
         """Test fallback to default steps for unknown symptom."""
-        steps = self.service.get_troubleshooting_steps("washer", "unknown_symptom")
+        steps = diag_service.get_troubleshooting_steps("washer", "unknown_symptom")
         assert len(steps) > 0
         # Should return default troubleshooting steps
     
-    def test_match_symptom(self):
+    def test_match_symptom(self, diag_service):
         """Test symptom matching."""
-        matched, score = self.service.match_symptom("washer", "my washer won't start")
+        matched, score = diag_service.match_symptom("washer", "my washer won't start")
         assert matched is not None
         assert score > 0
     
-    def test_should_schedule_technician(self):
-        """Test technician scheduling recommendation."""
+    @pytest.mark.parametrize("appliance,description", [
+        ("washer", "my washer won't start"),
+        ("refrigerator", "the fridge is not cooling and makes a loud noise"),
+        ("dryer", "something unrelated entirely"),
+    ])
+    def test_match_symptom_benchmark(self, benchmark, appliance, description):
+        """Benchmark the uncached symptom scoring path."""
+        # match_symptom is memoized, so time the wrapped function directly
+        benchmark(_match_symptom.__wrapped__, appliance, description)
+    
+    @pytest.mark.parametrize("kwargs,expected", [
         # Issue resolved - no need for technician
-        assert not self.service.should_schedule_technician(
-            troubleshooting_attempted=["step1"],
-            issue_resolved=True
-        )
-        
+        (dict(troubleshooting_attempted=["step1"], issue_resolved=True), False),
         # High severity - need technician
-        assert self.service.should_schedule_technician(
-            troubleshooting_attempted=[],
-            issue_resolved=False,
-            symptom_severity="high"
-        )
-        
+        (dict(troubleshooting_attempted=[], issue_resolved=False,
+              symptom_severity="high"), True),
         # Multiple steps tried, not resolved - need technician
-        assert self.service.should_schedule_technician(
-            troubleshooting_attempted=["step1", "step2"],
-            issue_resolved=False
-        )
+        (dict(troubleshooting_attempted=["step1", "step2"], issue_resolved=False), True),
+        # One step tried, not resolved - keep troubleshooting
+        (dict(troubleshooting_attempted=["step1"], issue_resolved=False), False),
+    ])
+    def test_should_schedule_technician(self, diag_service, kwargs, expected):
+        """Test technician scheduling recommendation."""
+        assert diag_service.should_schedule_technician(**kwargs) is expected
 
 
+@pytest.mark.db
 class TestCustomerService:
     """Tests for the customer service."""
     
-    def test_get_or_create_customer_new(self, db_session):
+    def test_get_or_create_customer_new(self, customer_service):
         """Test creating new customer."""
-        service = CustomerService(db_session)
         phone = "+15551234567"
         
-        customer = service.get_or_create_customer(phone)
+        customer = customer_service.get_or_create_customer(phone)
         
         assert customer is not None
         assert customer.phone == phone
         assert customer.id is not None
     
-    def test_get_or_create_customer_existing(self, db_session):
+    def test_get_or_create_customer_existing(self, customer_service, sample_customer):
         """Test getting existing customer."""
-        service = CustomerService(db_session)
-        phone = "+15551234567"
-        
-        # Create customer
-        customer1 = service.get_or_create_customer(phone)
-        
         # Should return same customer
-        customer2 = service.get_or_create_customer(phone)
+        customer = customer_service.get_or_create_customer(sample_customer.phone)
         
-        assert customer1.id == customer2.id
+        assert customer.id == sample_customer.id
     
-    def test_update_customer(self, db_session):
+    def test_update_customer(self, customer_service, sample_customer):
         """Test updating customer info."""
-        service = CustomerService(db_session)
-        
-        # Create customer
-        customer = service.get_or_create_customer("+15551234567")
-        
-        # Update
-        updated = service.update_customer(
-            customer.id,
+        updated = customer_service.update_customer(
+            sample_customer.id,
             first_name="John",
             last_name="Doe",
             email="john@example.com"
@@ -130,24 +151,148 @@ class TestCustomerService:
 class TestSchedulingService:
     """Tests for the scheduling service."""
     
-    def test_generate_confirmation_number(self, db_session):
+    @pytest.mark.db
+    def test_generate_confirmation_number(self, scheduling_service):
         """Test confirmation number generation."""
-        service = SchedulingService(db_session)
-        
-        conf1 = service._generate_confirmation_number()
-        conf2 = service._generate_confirmation_number()
+        count = 10_000
+        confs = [scheduling_service._generate_confirmation_number() for _ in range(count)]
         
-        assert conf1.startswith("SHS-")
-        assert len(conf1) == 12  # SHS- + 8 chars
-        assert conf1 != conf2  # Should be unique
+        assert all(c.startswith("SHS-") and len(c) == 12 for c in confs)  # SHS- + 8 chars
+        assert len(set(confs)) == count  # Should be unique
     
-    def test_get_available_slots_no_technicians(self, db_session):
+    def test_get_available_slots_no_technicians(self):
         """Test availability with no technicians."""
-        service = SchedulingService(db_session)
+        # The empty-table query itself is exercised by the API tests
+        db = MagicMock(spec=Session)
+        db.query.return_value = _EmptyQuery()
+        scheduling_service = SchedulingService(db)
         
-        slots = service.get_available_slots(
+        slots = scheduling_service.get_available_slots(
             zip_code="90210",
             appliance_type="washer"
         )
         
         assert slots == []
+    
+    @pytest.mark.db
+    def test_get_available_slots(self, scheduling_service, sample_technicians):
+        """Test availability across many technicians."""
+        slots = scheduling_service.get_available_slots(
+            zip_code="90210",
+            appliance_type="washer"
+        )
+        
+        assert len(slots) == 2 * len(sample_technicians)
+        assert {slot.technician_id for slot in slots} == set(sample_technicians)
+        start_times = [slot.start_time for slot in slots]
+        assert start_times == sorted(start_times)
+    
+    @pytest.mark.db
+    @pytest.mark.parametrize("appliance_type,zip_code,preference,expected", [
+        ("dryer", "90210", TimePreference.ANY, 20),
+        ("washer", "90210", TimePreference.MORNING, 20),
+        ("dryer", "90210", TimePreference.AFTERNOON, 10),
+        ("washer", "10001", TimePreference.ANY, 0),
+    ])
+    def test_get_available_slots_filters(
+        self, scheduling_service, sample_technicians,
+        appliance_type, zip_code, preference, expected
+    ):
+        """Test availability filtering by appliance, zip code and time of day."""
+        slots = scheduling_service.get_available_slots(
+            zip_code=zip_code,
+            appliance_type=appliance_type,
+            time_preference=preference
+        )
+        
+        assert len(slots) == expected
+
+
+@pytest.mark.db
+class TestTechnicianService:
+    """Tests for the technician service."""
+    
+    @pytest.mark.parametrize("appliance_type,zip_code,days_ahead,expected", [
+        ("washer", "90210", None, 20),
+        ("dryer", "90210", None, 10),
+        ("washer", "90210", 1, 20),
+        ("dryer", "90210", 1, 10),
+        ("washer", "90210", 2, 0),  # no slots that day
+        ("washer", "10001", None, 0),
+    ])
+    def test_find_technicians_by_criteria(
+        self, technician_service, sample_technicians,
+        appliance_type, zip_code, days_ahead, expected
+    ):
+        """Test technician search by zip code, appliance and date."""
+        target_date = date.today() + timedelta(days=days_ahead) if days_ahead else None
+        
+        technicians = technician_service.find_technicians_by_criteria(
+            zip_code=zip_code,
+            appliance_type=appliance_type,
+            target_date=target_date
+        )
+        
+        assert len(technicians) == expected
+        assert len({tech.id for tech in technicians}) == expected
+        for tech in technicians:
+            assert "time_slots" not in inspect(tech).unloaded
+            assert len(tech.time_slots) == 2
+
+
+class TestTimePreference:
+    """Tests for time-of-day preference parsing."""
+    
+    def test_parse_time_preference(self):
+        """Test known, unknown and missing preferences."""
+        assert parse_time_preference("morning") is TimePreference.MORNING
+        assert parse_time_preference(" Afternoon ") is TimePreference.AFTERNOON
+        assert parse_time_preference("any") is TimePreference.ANY
+        assert parse_time_preference("evening") is TimePreference.ANY
+        assert parse_time_preference(None) is TimePreference.ANY
+
+
+class TestSlotFormatting:
+    """Tests for slot date/time formatting helpers."""
+    
+    def test_format_slot_date(self):
+        """Test date formatting matches the strftime layout."""
+        start = date(2024, 1, 1)
+        for offset in range(0, 366, 17):
+            day = start + timedelta(days=offset)
+            assert format_slot_date(day) == day.strftime("%A, %B %d")
+    
+    def test_format_slot_time(self):
+        """Test time formatting matches the strftime layout."""
+        for hour in range(24):
+            for minute in (0, 30):
+                value = time(hour, minute)
+                expected = value.strftime("%I:%M %p").lstrip("0")
+                assert format_slot_time(value) == expected
+
+
+class TestSessionManager:
+    """Tests for the in-memory session manager."""
+    
+    async def test_snapshot_restore_round_trip(self):
+        """Test a snapshot restores to an identical, retrievable session."""
+        manager = SessionManager()
+        session = await manager.create_session("CA123", "+15551234567", customer_id=7)
+        session.add_fact("Customer has a washer")
+        session.add_fact("Washer won't spin")
+        session.diagnostic.appliance_type = "washer"
+        session.diagnostic.add_symptoms(["won't spin", "loud noise"])
+        session.phase = ConversationPhase.TROUBLESHOOTING
+        session.last_interaction = datetime(2024, 5, 17, 14, 30, 15, 123456)
+        
+        data = manager.snapshot("CA123")
+        restored_manager = SessionManager()
+        restored = restored_manager.restore(data)
+        
+        assert restored.model_dump() == session.model_dump()
+        assert restored.phase is ConversationPhase.TROUBLESHOOTING
+        assert restored_manager.get_session("CA123") is restored
+    
+    def test_snapshot_unknown_session(self):
+        """Test snapshotting a call with no session."""
+        assert SessionManager().snapshot("CA-missing") is None